@@ -2,34 +2,939 @@
 import os
 import json
 import time
+import random
+import atexit
+import hashlib
+import threading
+from bisect import bisect_right
+from collections import deque
+from itertools import accumulate
+from concurrent.futures import ThreadPoolExecutor, wait
+from cachetools import LRUCache
 import pandas as pd
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    # Faster JSON encoding for request payloads
+    import orjson
+except ImportError:
+    orjson = None
 from tqdm import tqdm
 from datetime import datetime
+from types import MappingProxyType
 import re
-import io
 import base64
 import tempfile
-import PyPDF2
-from pdf2image import convert_from_bytes
+import fitz  # PyMuPDF
+from pdf2image import convert_from_bytes, pdfinfo_from_bytes
 import pytesseract
 from mistralai import Mistral
+try:
+    # Linear-time RE2 matching for the literal keyword patterns. Patterns using
+    # lookarounds or \s (whose Unicode meaning differs in RE2) stay on stdlib re
+    import re2 as _literal_re
+except ImportError:
+    _literal_re = re
+
+# Mistral model used for OCR clean-up and document summarization
+MISTRAL_MODEL = "mistral-large-latest"
+
+# Maximum number of concurrent Mistral requests when summarizing chunks
+MISTRAL_MAX_CONCURRENCY = 5
+
+# Attempts per Mistral request when it is rate limited (HTTP 429)
+MISTRAL_MAX_ATTEMPTS = 3
+
+# Maximum number of PDF page batches rasterized or OCR'd at the same time across the
+# whole host; past about six concurrent tesseract processes the pages mostly compete
+# for memory bandwidth. Set OCR_MAX_WORKERS to change the host-wide budget, which is
+# split evenly between the WEB_CONCURRENCY server processes (at least one each)
+OCR_MAX_WORKERS = max(1, int(os.environ.get("OCR_MAX_WORKERS", min(os.cpu_count() or 1, 6)))
+                      // int(os.environ.get("WEB_CONCURRENCY", 1)))
+
+# Most pages handed to a single tesseract run; each run loads the OCR engine and
+# language model once for all of its pages. Very long image lists can stall tesseract
+OCR_BATCH_PAGES = 50
+
+# Pages are already OCR'd in parallel, one tesseract process each, so keep every
+# process single-threaded instead of oversubscribing the cores with OpenMP threads.
+# Set before any tesseract subprocess starts, which inherits the environment, and
+# before libtesseract is loaded in-process below. This limits every OpenMP library
+# in the process, not only tesseract; set OMP_THREAD_LIMIT before start-up to override
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+try:
+    # In-process libtesseract bindings: no subprocess per batch, and each thread of the
+    # shared OCR pool below keeps its engine and language model loaded across batches
+    # and documents
+    import tesserocr
+except ImportError:
+    tesserocr = None
+_tesserocr_local = threading.local()
+_tesserocr_apis = []  # Every engine created, ended when the process exits
+_tesserocr_apis_lock = threading.Lock()
+
+
+@atexit.register
+def _end_tesserocr_apis():
+    """Release the OCR engines once the pool threads using them have finished"""
+    _ocr_executor.shutdown(wait=True)
+    with _tesserocr_apis_lock:
+        for api in _tesserocr_apis:
+            api.End()
+        _tesserocr_apis.clear()
+
+
+# One OCR pool for the process, shared by every evaluator and document, so concurrent
+# uploads queue for OCR_MAX_WORKERS slots instead of each starting their own workers
+_ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS, thread_name_prefix="ocr")
+
+# Pages with an image, no fonts and fewer stripped characters of text than this are
+# treated as scans and OCR'd
+PDF_SCANNED_PAGE_CHARS = 50
+
+# Directory for cached PDF text, OCR, Mistral and Perplexity results, keyed by content
+# hash. Entries hold uploaded document text in plain form, so the disk tier is opt-in:
+# without COMPLIANCE_CACHE_DIR results are only cached in memory
+CACHE_DIR = os.environ.get("COMPLIANCE_CACHE_DIR") or None
+# Seconds a cached document result stays valid before it is treated as a miss and deleted
+CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+# Upper bound on the disk cache; past it the least recently written entries are deleted
+CACHE_MAX_BYTES = 1 << 30
+# Seconds between sweeps of the disk cache for expired entries and the size bound
+CACHE_PRUNE_INTERVAL = 10 * 60
+
+# Most recently used cache entries are also kept in memory, so repeats skip the disk
+# read and JSON decode. One cache is shared by every evaluator in the process and
+# bounded by the approximate size of its entries (characters of text or JSON)
+MEMORY_CACHE_BYTES = 64 * 1024 * 1024
+
+# Mistral requests are budgeted in tokens, estimated at ~4 characters per token
+MISTRAL_CHARS_PER_TOKEN = 4
+# Input token budget for one OCR clean-up request and one summarization chunk
+MISTRAL_OCR_INPUT_TOKENS = 2000
+MISTRAL_CHUNK_TOKENS = 24000
+# OCR clean-up requests per document; text beyond them is kept as raw OCR output
+MISTRAL_OCR_MAX_CHUNKS = 8
+# Output token budget for chunk summaries and the combined meta-summary
+MISTRAL_SUMMARY_MAX_TOKENS = 1000
+MISTRAL_META_SUMMARY_MAX_TOKENS = 1200
+
+PERPLEXITY_API_URL = "https://api.perplexity.ai/chat/completions"
+
+# Use llama-3.1-sonar-large-128k-online model for comprehensive internet search
+PERPLEXITY_MODEL = "llama-3.1-sonar-large-128k-online"
+
+# System message sent with every Perplexity request, built once
+_PERPLEXITY_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a financial compliance expert who specializes in evaluating businesses against government regulations. 
+Your task is to analyze a company's financial data and provide a detailed compliance report with the following characteristics:
+
+1. ONLY cite official government websites, regulatory bodies, and authoritative legal sources
+2. Format your analysis as a professional Markdown document with proper headings, bullet points, and sections
+3. Include direct links to government websites and regulatory documents whenever possible
+4. Provide company-specific insights that directly address their unique situation
+5. Structure your response to be both comprehensive for professionals and understandable to non-experts
+6. When recommending solutions, be specific about implementation timelines, responsibilities, and expected outcomes
+7. Include a "References" section at the end with numbered citations to all government sources
+8. IMPORTANT: Provide a clear numerical compliance score from 0-100 in a section called "Compliance Score"
+
+Be thorough in your research and analysis. Use current regulations and requirements appropriate to the company's location and industry."""
+}
+
+# (connect, read) timeout in seconds and attempt budget for Perplexity requests; responses
+# are streamed, so the read timeout bounds the gap between chunks
+PERPLEXITY_TIMEOUT = (5, 60)
+PERPLEXITY_MAX_ATTEMPTS = 3
+
+# Seconds a cached Perplexity response stays valid; regulations change
+PERPLEXITY_CACHE_TTL = 24 * 60 * 60
+
+# Pooled keep-alive connections to the Perplexity API per evaluator
+PERPLEXITY_POOL_SIZE = 16
+
+# Transient gateway errors retried inside the connection pool, with exponential backoff,
+# before a response reaches query_perplexity_api. Rate limits (429) and connection
+# failures are retried there instead, through the rate limiter
+PERPLEXITY_SERVER_RETRY = Retry(
+    total=3, connect=0, read=0, backoff_factor=1, status_forcelist=(502, 503, 504),
+    allowed_methods=None, respect_retry_after_header=True, raise_on_status=False
+)
+
+# Perplexity requests and tokens (prompt plus output budget) sent per rolling minute
+# per evaluator; None disables the token limit
+PERPLEXITY_RPM_LIMIT = 50
+PERPLEXITY_TPM_LIMIT = None
+
+# Upper bound in seconds on any single retry wait
+RETRY_MAX_DELAY = 60
+
+# Display names for the supported jurisdiction codes
+JURISDICTION_NAMES = MappingProxyType({
+    'us': 'United States',
+    'uk': 'United Kingdom',
+    'eu': 'European Union',
+    'ca': 'Canada',
+    'au': 'Australia',
+    'sg': 'Singapore',
+    'hk': 'Hong Kong'
+})
+
+# Companies packed into one batched Perplexity request, the largest profile that may
+# be batched, and the output tokens requested per company in a batch
+BATCH_MAX_COMPANIES = 4
+BATCH_MAX_PROFILE_CHARS = 3000
+BATCH_REPORT_TOKENS = 2000
+
+# Markdown patterns used when post-processing and parsing the Perplexity report
+_CITATION_RE = re.compile(r'\[([^\]]+)\]\((https?://[^\)]+)\)')
+_REFERENCES_HEADING_RE = re.compile(r'# References|## References', re.IGNORECASE)
+_SUMMARY_HEADING_RE = re.compile(r'## Executive Summary|## Summary', re.IGNORECASE)
+_REPORT_HEADER_RE = re.compile(r'(# Financial Compliance Evaluation.*?\n\n\*\*Date\*\*:.*?\n\n)')
+_EXECUTIVE_SUMMARY_RE = re.compile(r'## Executive Summary\s*(.*?)(?=\n## |\n# )', re.DOTALL | re.IGNORECASE)
+_BULLET_RE = re.compile(r'^(?:\d+\.|\*|\-)\s*(.*?)$', re.MULTILINE)
+
+# Compliance score patterns: a dedicated section, a number out of 100 within it, an
+# inline "compliance score is N" mention, and wording-based fallbacks in priority order.
+# Each IGNORECASE pattern is only run once its hint is found in the lowercased content;
+# hints avoid "i" and "s", which the patterns also match as "İ", "ı" and "ſ"
+_SCORE_SECTION_RE = re.compile(r'## Compliance Score\s*(.*?)(?=\n## |\n# |$)', re.DOTALL | re.IGNORECASE)
+_SCORE_VALUE_RE = re.compile(r'(\d+)(?:\s*\/\s*100|\s*percent|\s*%)')
+_SCORE_MENTION_RE = re.compile(r'compliance\s+score\s+(?:is|of)\s+(\d+)(?:\s*\/\s*100|\s*percent|\s*%)', re.IGNORECASE)
+_SCORE_SECTION_HINT = "## compl"
+_SCORE_MENTION_HINT = "core"
+_COMPLIANCE_WORDING_SCORES = (
+    (("fully", "complete"), re.compile(r'fully\s+compliant|complete\s+compliance', re.IGNORECASE), 90),
+    (("largely", "tly"), re.compile(r'largely\s+compliant|mostly\s+compliant', re.IGNORECASE), 75),
+    (("part",), re.compile(r'partially\s+compliant|partial\s+compliance', re.IGNORECASE), 50),
+    (("non", "not"), re.compile(r'non.?compliant|not\s+compliant', re.IGNORECASE), 20),
+)
+
+# Per-item classification patterns used by extract_requirements. Items are lowercased
+# once and matched against lowercase patterns instead of case-folding in every search.
+# The pure-literal ones use RE2 when it is installed. Each pattern has a tuple of
+# literals, at least one of which must occur for it to match, checked with a cheap
+# substring test first; for pure-literal patterns the test alone is exact
+_STATUS_MET_RE = _literal_re.compile(r'compliant|in compliance|meets? requirements?')
+_STATUS_MET_HINTS = ("compliant", "in compliance", "requirement")
+_STATUS_PARTIAL_TERMS = ("partially", "in progress", "some compliance")
+_STATUS_PARTIAL_RE = _literal_re.compile('|'.join(_STATUS_PARTIAL_TERMS))
+# Requirement categories in priority order and risk keywords, all found in a single
+# scan; the lookahead reports overlapping mentions too, so priority never depends on
+# match position
+_CATEGORIES = ["Tax", "Reporting", "Financial", "Data Protection", "Employment", "Banking", "Securities", "Environmental", "Health"]
+_CATEGORY_RANKS = {cat.lower(): rank for rank, cat in enumerate(_CATEGORIES)}
+_HIGH_RISK_TERMS = frozenset(["high risk", "severe", "critical"])
+_LOW_RISK_TERMS = frozenset(["low risk", "minor"])
+_KEYWORD_TERMS = tuple(_CATEGORY_RANKS) + tuple(sorted(_HIGH_RISK_TERMS)) + tuple(sorted(_LOW_RISK_TERMS))
+_KEYWORD_RE = re.compile(r'(?=(' + '|'.join(_KEYWORD_TERMS) + r'))')
+_SENTENCE_END_RE = re.compile(r'[.!?]\s+')
+_REQUIREMENT_TERMS = ("require", "regulat", "comply", "law", "rule")
+# Phrases introducing a recommendation in free text; the mention runs to the next period
+_RECOMMENDATION_TRIGGER_RE = re.compile(r'(?:recommend|should|must|need to|advised to)\s+', re.IGNORECASE)
+# Recommendation priority keywords in one alternation per kind of text, matched against
+# lowercased text; bullet items also recognise explicit "high/low priority" labels. No
+# keyword can overlap another, so a single left-to-right scan sees every one
+_ITEM_PRIORITY_RE = re.compile(
+    r'(?P<high>immediately|urgent|critical|high priority)|(?P<low>when possible|consider|may want to|low priority)'
+)
+_MENTION_PRIORITY_RE = re.compile(r'(?P<high>immediately|urgent|critical)|(?P<low>when possible|consider|may want to)')
+# Substring prefilters: at least one of these occurs in any text the patterns match
+_MENTION_PRIORITY_HINTS = ("immediately", "urgent", "critical", "when possible", "consider", "may want to")
+_ITEM_PRIORITY_HINTS = _MENTION_PRIORITY_HINTS + ("priority",)
+_TIMEFRAME_RE = re.compile(r'within (\d+\s+(?:days?|weeks?|months?|years?))', re.IGNORECASE)
+# Markdown link in a reference item: (link text, URL)
+_REFERENCE_LINK_RE = re.compile(r'\[(.*?)\]\((https?://[^\)]+)\)')
+
+# Lowercased heading prefixes identifying the report sections each extractor reads
+_REQUIREMENTS_HEADINGS = ("requirement", "regulation", "compliance requirement", "regulatory requirement")
+_FINDINGS_HEADINGS = ("findings", "analysis", "assessment", "evaluation")
+_RECOMMENDATIONS_HEADINGS = ("recommendation", "action item", "next step", "suggested action")
+_REFERENCES_HEADINGS = ("references", "sources", "citations", "regulatory sources")
+
+
+def _retry_delay(retry_after, attempt):
+    """
+    Seconds to wait before retrying a request
+    
+    Args:
+        retry_after (str): Value of the Retry-After response header, if any
+        attempt (int): Zero-based number of the attempt that just failed
+        
+    Returns:
+        float: Delay, capped at RETRY_MAX_DELAY
+    """
+    if retry_after:
+        try:
+            return min(RETRY_MAX_DELAY, max(0.0, float(retry_after)))
+        except ValueError:
+            pass  # HTTP-date form; fall back to exponential backoff
+    return min(RETRY_MAX_DELAY, 5 * 2 ** attempt + random.uniform(0, 1))
+
+
+def _content_key(data):
+    """Cache key for bytes; BLAKE2b hashes large documents faster than SHA-256"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# In-memory tier in front of the disk cache: (namespace, key) -> (stored at, value, size)
+_memory_cache = LRUCache(maxsize=MEMORY_CACHE_BYTES, getsizeof=lambda entry: entry[2])
+_memory_cache_lock = threading.Lock()
+
+
+def _memory_cache_put(cache_key, stored_at, value, size):
+    """Keep a result in the shared in-memory cache, unless it alone exceeds the bound"""
+    with _memory_cache_lock:
+        try:
+            _memory_cache[cache_key] = (stored_at, value, size)
+        except ValueError:
+            # Larger than MEMORY_CACHE_BYTES; an older copy must not outlive it
+            _memory_cache.pop(cache_key, None)
+
+
+_cache_prune_lock = threading.Lock()
+_cache_pruned_at = 0.0
+
+
+def _prune_disk_cache():
+    """
+    Delete expired entries from the disk cache, then the oldest entries while it is
+    larger than CACHE_MAX_BYTES
+    
+    Runs at most once per CACHE_PRUNE_INTERVAL in a process; evaluators share CACHE_DIR.
+    """
+    global _cache_pruned_at
+    if CACHE_DIR is None:
+        return
+    now = time.time()
+    with _cache_prune_lock:
+        if now - _cache_pruned_at < CACHE_PRUNE_INTERVAL:
+            return
+        _cache_pruned_at = now
+    
+    entries = []  # (modified at, size, path) of the entries kept
+    total_bytes = 0
+    try:
+        namespaces = [entry for entry in os.scandir(CACHE_DIR) if entry.is_dir()]
+    except OSError:
+        return
+    for namespace in namespaces:
+        try:
+            files = list(os.scandir(namespace.path))
+        except OSError:
+            continue
+        max_age = PERPLEXITY_CACHE_TTL if namespace.name == "perplexity" else CACHE_MAX_AGE
+        for entry in files:
+            try:
+                stat = entry.stat()
+                if now - stat.st_mtime > max_age:
+                    os.remove(entry.path)
+                    continue
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_bytes += stat.st_size
+    
+    if total_bytes > CACHE_MAX_BYTES:
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total_bytes -= size
+            if total_bytes <= CACHE_MAX_BYTES:
+                break
+
+
+def _mistral_retry_after(error):
+    """
+    Retry-After header of a rate-limited Mistral client error
+    
+    Args:
+        error (Exception): Error raised by the Mistral client
+        
+    Returns:
+        str: Header value ("" if absent), or None if the error is not a 429
+    """
+    if getattr(error, "status_code", None) != 429:
+        return None
+    headers = getattr(getattr(error, "raw_response", None), "headers", None) or {}
+    return headers.get("Retry-After", "")
+
+
+def _dumps(obj):
+    """Serialize obj to JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def _loads(data):
+    """Parse JSON from bytes or str, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _read_completion_stream(response):
+    """
+    Assemble a server-sent-events chat completion into the non-streaming response shape
+    
+    Args:
+        response (requests.Response): Streaming response from the chat completions endpoint
+        
+    Returns:
+        dict: Response with the full message under choices[0].message.content, plus the
+            top-level fields (id, model, citations, usage, ...) of the last event
+    """
+    # Fall back to the plain body if the API answered without streaming
+    if response.headers.get("Content-Type", "").startswith("application/json"):
+        return response.json()
+    
+    parts = []
+    last_event = {}
+    finish_reason = None
+    for line in response.iter_lines():
+        if not line.startswith(b"data:"):
+            continue
+        data = line[5:].strip()
+        if data == b"[DONE]":
+            break
+        event = _loads(data)
+        last_event = event
+        for choice in event.get("choices", []):
+            content = (choice.get("delta") or {}).get("content")
+            if content:
+                parts.append(content)
+            finish_reason = choice.get("finish_reason") or finish_reason
+    
+    result = {key: value for key, value in last_event.items() if key != "choices"}
+    result["choices"] = [{
+        "index": 0,
+        "finish_reason": finish_reason,
+        "message": {"role": "assistant", "content": "".join(parts)}
+    }]
+    return result
+
+
+def _page_is_scanned(page, page_text):
+    """
+    Whether a PyMuPDF page looks like a scan that needs OCR
+    
+    Scanned pages carry an image but no fonts and (almost) no text layer. Pages
+    without an image are left alone, so the blank pages common in born-digital PDFs
+    are not rasterized and OCR'd for nothing.
+    
+    Args:
+        page (fitz.Page): PDF page
+        page_text (str): Text layer of the page
+        
+    Returns:
+        bool: True if the page should be OCR'd
+    """
+    return (len(page_text.strip()) < PDF_SCANNED_PAGE_CHARS
+            and not page.get_fonts() and bool(page.get_images()))
+
+
+def _ocr_image_batch(image_paths, list_path):
+    """
+    OCR a batch of page images
+    
+    Uses tesserocr when it is installed, with one engine per OCR pool thread that stays
+    loaded for the life of the process; otherwise a single tesseract subprocess reads
+    the whole batch from an image list file.
+    
+    Args:
+        image_paths (list): Page image files, in page order
+        list_path (str): Where to write the image list file for the subprocess
+        
+    Returns:
+        list: Raw OCR'd text of each page
+    """
+    if tesserocr is not None:
+        api = getattr(_tesserocr_local, "api", None)
+        if api is None:
+            api = _tesserocr_local.api = tesserocr.PyTessBaseAPI()
+            with _tesserocr_apis_lock:
+                _tesserocr_apis.append(api)
+        page_texts = []
+        for path in image_paths:
+            api.SetImageFile(path)
+            page_texts.append(api.GetUTF8Text())
+        return page_texts
+    
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write("".join(path + "\n" for path in image_paths))
+    # Tesseract ends every page with a form feed
+    return pytesseract.image_to_string(list_path).split("\f")[:-1]
+
+
+def _ocr_page_range(pdf_content, temp_dir, first_page, last_page):
+    """
+    Rasterize and OCR one consecutive range of PDF pages
+    
+    Args:
+        pdf_content (bytes): PDF file content
+        temp_dir (str): Directory for the page images and image list
+        first_page (int): First page of the range, from 1
+        last_page (int): Last page of the range, inclusive
+        
+    Returns:
+        list: Raw OCR'd text of each page in the range
+    """
+    # Let poppler write the page images straight to disk instead of decoding every
+    # page into memory at once. Uncompressed PPM skips the PNG encode in poppler and
+    # the decode in tesseract, and grayscale (PGM) output is a third the size of RGB
+    # and skips tesseract's own colour conversion
+    image_paths = convert_from_bytes(
+        pdf_content, output_folder=temp_dir, paths_only=True, fmt='ppm', grayscale=True,
+        first_page=first_page, last_page=last_page
+    )
+    return _ocr_image_batch(image_paths, os.path.join(temp_dir, f"pages-{first_page}.txt"))
+
+
+def _estimate_tokens(text):
+    """Approximate the number of tokens in text from its length"""
+    return len(text) // MISTRAL_CHARS_PER_TOKEN + 1
+
+
+def _split_by_tokens(text, max_tokens):
+    """
+    Split text into consecutive chunks of at most max_tokens estimated tokens
+    
+    Chunks end after a blank line where one fits, so paragraphs stay whole; only a
+    paragraph longer than a whole chunk is cut at the size limit.
+    """
+    size = max_tokens * MISTRAL_CHARS_PER_TOKEN
+    chunks = []
+    start = 0
+    while len(text) - start > size:
+        end = text.rfind("\n\n", start, start + size)
+        end = end + 2 if end > start else start + size
+        chunks.append(text[start:end])
+        start = end
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
+
+
+def _mentions_any(text, terms):
+    """Whether any of the literal terms occurs in text"""
+    return any(term in text for term in terms)
+
+
+def _classify_items(items):
+    """
+    Classify requirement items by status, category and risk
+    
+    Each pattern runs once over the lowercased items joined by newlines, and matches
+    are mapped back to their item by offset, instead of searching every item
+    separately. No pattern can match across a newline, so results are per item.
+    
+    Args:
+        items (list): Requirement texts (single lines)
+        
+    Returns:
+        tuple: Lists of statuses, categories and risks, one entry per item
+    """
+    items_lc = [item.lower() for item in items]
+    joined = "\n".join(items_lc)
+    starts = list(accumulate((len(item_lc) + 1 for item_lc in items_lc[:-1]), initial=0))
+    
+    def owners(pattern, hints):
+        # Skip the regex pass entirely when none of its literals occur
+        if not _mentions_any(joined, hints):
+            return set()
+        return {bisect_right(starts, match.start()) - 1 for match in pattern.finditer(joined)}
+    
+    met = owners(_STATUS_MET_RE, _STATUS_MET_HINTS)
+    partial = owners(_STATUS_PARTIAL_RE, _STATUS_PARTIAL_TERMS)
+    mentions = [set() for _ in items_lc]
+    if _mentions_any(joined, _KEYWORD_TERMS):
+        for match in _KEYWORD_RE.finditer(joined):
+            mentions[bisect_right(starts, match.start()) - 1].add(match.group(1))
+    
+    statuses, categories, risks = [], [], []
+    for index, item_mentions in enumerate(mentions):
+        status = "not-met"  # Default
+        if index in met:
+            status = "met"
+        elif index in partial:
+            status = "partial"
+        statuses.append(status)
+        
+        ranks = [_CATEGORY_RANKS[mention] for mention in item_mentions if mention in _CATEGORY_RANKS]
+        categories.append(_CATEGORIES[min(ranks)] if ranks else "General")
+        
+        risk = "medium"  # Default
+        if item_mentions & _HIGH_RISK_TERMS:
+            risk = "high"
+        elif item_mentions & _LOW_RISK_TERMS:
+            risk = "low"
+        risks.append(risk)
+    
+    return statuses, categories, risks
+
+
+def _find_recommendation_mentions(content):
+    """
+    Find the text following each recommendation trigger phrase, up to the next period
+    
+    Same results as re.findall(r'(?:recommend|should|must|need to|advised to)\s+(.*?)(?:\.|$)',
+    content, re.IGNORECASE), but the end of each mention is located with str.find
+    instead of testing for a period at every character in the regex engine.
+    
+    Args:
+        content (str): Markdown content
+        
+    Returns:
+        list: Mention texts, without the trigger phrase or the period
+    """
+    mentions = []
+    last = len(content) - 1
+    pos = 0
+    while True:
+        match = _RECOMMENDATION_TRIGGER_RE.search(content, pos)
+        if not match:
+            return mentions
+        start = match.end()
+        dot = content.find('.', start)
+        newline = content.find('\n', start)
+        if dot != -1 and (newline == -1 or dot < newline):
+            # Ends at a period on the same line
+            mentions.append(content[start:dot])
+            pos = dot + 1
+        elif newline == -1 or newline == last:
+            # No period before the end of the text (or its trailing newline)
+            end = len(content) if newline == -1 else newline
+            mentions.append(content[start:end])
+            pos = end
+        else:
+            # A mention cannot span lines; keep looking from the next character
+            pos = match.start() + 1
+
+
+def _priority(text_lc, pattern, hints):
+    """
+    Priority of a recommendation from the keywords in its lowercased text
+    
+    Any high-priority keyword wins, then any low-priority one; the scan stops at the
+    first high-priority keyword. Text without any of the hints, the common case, is
+    rejected by substring checks before the regex runs.
+    
+    Args:
+        text_lc (str): Lowercased recommendation text
+        pattern (Pattern): _ITEM_PRIORITY_RE or _MENTION_PRIORITY_RE
+        hints (tuple): The matching _ITEM_PRIORITY_HINTS or _MENTION_PRIORITY_HINTS
+        
+    Returns:
+        str: 'high', 'medium' or 'low'
+    """
+    priority = "medium"  # Default
+    if not _mentions_any(text_lc, hints):
+        return priority
+    for match in pattern.finditer(text_lc):
+        if match.lastgroup == "high":
+            return "high"
+        priority = "low"
+    return priority
+
+
+def _is_government_url(url):
+    """
+    Whether the host of an http(s) URL is under a government domain
+    
+    Only the host is checked, so '.gov' in a path or query string does not count. Hosts
+    under a national government domain such as gov.uk count as well as .gov ones. The
+    host is sliced out with str.find rather than parsed with urlsplit, and URLs without
+    '.gov' anywhere, the common case, are rejected by a single substring check.
+    
+    Args:
+        url (str): Absolute http(s) URL, possibly empty
+        
+    Returns:
+        bool: True for a government host
+    """
+    if '.gov' not in url:
+        return False
+    host_end = url.find('/', 8)  # The first slash after "https://"
+    host = (url if host_end < 0 else url[:host_end]).partition('?')[0].partition('#')[0]
+    return host.endswith('.gov') or '.gov.' in host or '.gov:' in host
+
+
+def _find_bullets(text):
+    """
+    Find the text of every bullet or numbered item
+    
+    Same results as _BULLET_RE.findall(text): lines are located with str.find and
+    only a line's first character is tested for a marker, instead of running the
+    MULTILINE regex engine over every character. As with the regex, whitespace
+    after a marker may run onto the following lines.
+    
+    Args:
+        text (str): Markdown text
+        
+    Returns:
+        list: Item texts, without the marker
+    """
+    bullets = []
+    length = len(text)
+    start = 0
+    while start < length:
+        first = text[start]
+        marker_end = start + 1
+        if first.isdecimal():
+            # Numbered item: digits followed by a period
+            while marker_end < length and text[marker_end].isdecimal():
+                marker_end += 1
+            if marker_end < length and text[marker_end] == '.':
+                marker_end += 1
+            else:
+                marker_end = 0
+        elif first != '*' and first != '-':
+            marker_end = 0
+        
+        if marker_end:
+            while marker_end < length and text[marker_end].isspace():
+                marker_end += 1
+            newline = text.find('\n', marker_end)
+            bullets.append(text[marker_end:] if newline < 0 else text[marker_end:newline])
+        else:
+            newline = text.find('\n', start)
+        if newline < 0:
+            break
+        start = newline + 1
+    return bullets
+
+
+def _split_sentences(text):
+    """
+    Split text after sentence-ending punctuation followed by whitespace
+    
+    Equivalent to re.split(r'(?<=[.!?])\s+', text), without the lookbehind that
+    stops the regex engine from scanning ahead for a literal terminator.
+    
+    Args:
+        text (str): Text to split
+        
+    Returns:
+        list: Sentences, keeping their terminators
+    """
+    sentences = []
+    start = 0
+    for match in _SENTENCE_END_RE.finditer(text):
+        sentences.append(text[start:match.start() + 1])
+        start = match.end()
+    sentences.append(text[start:])
+    return sentences
+
+
+def _split_sections(content):
+    """
+    Split Markdown content into its sections in a single pass
+    
+    Args:
+        content (str): Markdown content
+        
+    Returns:
+        dict: Lowercased heading -> stripped section body, in document order.
+            Headings of level two and deeper are recorded, so a "### Recommendations"
+            subsection is found like a "## Recommendations" section. Every section
+            ends at the next H1 or H2 heading, so an H2 section includes its
+            subsections and a subsection runs on through any later siblings. Empty
+            sections are skipped and repeated headings keep their first non-empty
+            occurrence.
+    """
+    sections = {}
+    open_sections = []  # (heading, body start) of the sections the next H1 or H2 closes
+    
+    def close_sections(end):
+        for title, body_start in open_sections:
+            body = content[body_start:end].strip()
+            if body:
+                sections.setdefault(title, body)
+        open_sections.clear()
+    
+    # Only lines starting with "#" can be headings, so jump straight from one to the next
+    line_start = 0 if content.startswith('#') else content.find('\n#') + 1
+    while line_start or content.startswith('#'):
+        newline = content.find('\n', line_start)
+        line_end = len(content) if newline < 0 else newline
+        marker_end = line_start
+        while marker_end < line_end and content[marker_end] == '#':
+            marker_end += 1
+        if marker_end < line_end and content[marker_end] == ' ':
+            level = marker_end - line_start
+            if level <= 2:
+                close_sections(line_start)
+            if level >= 2:
+                open_sections.append((content[marker_end + 1:line_end].strip().lower(), line_end))
+        if newline < 0:
+            break
+        line_start = content.find('\n#', newline) + 1
+        if not line_start:
+            break
+    close_sections(len(content))
+    return sections
+
+
+def _find_section(sections, prefixes):
+    """Return the body of the first section whose heading starts with one of prefixes, or None"""
+    for title, body in sections.items():
+        if title.startswith(prefixes):
+            return body
+    return None
+
+
+class _RateLimiter:
+    """
+    Rolling one-minute request and token budget, shared by the threads using it
+    
+    acquire() blocks until one more request keeps the last minute within both
+    limits, so requests are spaced out before the API starts answering 429.
+    """
+    
+    def __init__(self, requests_per_minute, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._sent = deque()  # (monotonic time, tokens) of requests in the window
+        self._tokens = 0
+        self._lock = threading.Lock()
+    
+    def acquire(self, tokens):
+        """
+        Wait until a request of the given size may be sent, then record it
+        
+        Args:
+            tokens (int): Estimated tokens the request consumes
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0][0] >= 60:
+                    self._tokens -= self._sent.popleft()[1]
+                
+                # A request larger than the whole token budget may still go alone
+                tokens_ok = (self.tokens_per_minute is None or not self._sent
+                             or self._tokens + tokens <= self.tokens_per_minute)
+                if len(self._sent) < self.requests_per_minute and tokens_ok:
+                    self._sent.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                delay = 60 - (now - self._sent[0][0])
+            time.sleep(delay)
+
 
 class PerplexityComplianceEvaluator:
-    def __init__(self, perplexity_api_key, mistral_api_key=None):
+    def __init__(self, perplexity_api_key, mistral_api_key=None, use_cache=True):
         """
         Initialize the Financial Compliance Evaluator using Perplexity API
         
         Args:
             perplexity_api_key (str): Perplexity API key
             mistral_api_key (str, optional): Mistral API key for OCR and document analysis
+            use_cache (bool, optional): Reuse cached PDF text, OCR and Mistral results, from
+                disk as well as memory when COMPLIANCE_CACHE_DIR is set
         """
         self.perplexity_api_key = perplexity_api_key
         self.mistral_api_key = mistral_api_key
+        self.use_cache = use_cache
         self.mistral_client = None
         if mistral_api_key:
             self.mistral_client = Mistral(api_key=mistral_api_key)
+        # Documents are processed on several threads at once; their OCR clean-up
+        # requests share the same concurrency budget as chunk summaries
+        self._mistral_slots = threading.BoundedSemaphore(MISTRAL_MAX_CONCURRENCY)
+        
+        # Keep Perplexity connections alive so repeated evaluations skip the TCP/TLS handshake
+        self._session = requests.Session()
+        self._session.headers.update({
+            "Authorization": f"Bearer {perplexity_api_key}",
+            "Content-Type": "application/json"
+        })
+        self._session.mount("https://", HTTPAdapter(
+            pool_connections=PERPLEXITY_POOL_SIZE, pool_maxsize=PERPLEXITY_POOL_SIZE,
+            max_retries=PERPLEXITY_SERVER_RETRY
+        ))
+        self._perplexity_limiter = _RateLimiter(PERPLEXITY_RPM_LIMIT, PERPLEXITY_TPM_LIMIT)
+        # Cached Perplexity responses are only shared between holders of the same key
+        self._perplexity_cache_scope = _content_key((perplexity_api_key or "").encode('utf-8')).encode('ascii')
+        
+    def _cache_get(self, namespace, key, max_age=None):
+        """
+        Look up a cached result
+        
+        Args:
+            namespace (str): Cache namespace (one subdirectory per kind of result)
+            key (str): Content hash identifying the result
+            max_age (float, optional): Treat entries older than this many seconds as misses;
+                never more than CACHE_MAX_AGE
+            
+        Returns:
+            str: Cached value, or None on a miss
+        """
+        if not self.use_cache:
+            return None
+        max_age = CACHE_MAX_AGE if max_age is None else min(max_age, CACHE_MAX_AGE)
         
+        cache_key = (namespace, key)
+        with _memory_cache_lock:
+            entry = _memory_cache.get(cache_key)
+            if entry is not None and time.time() - entry[0] > max_age:
+                # Expired entries are dropped rather than left to hold memory
+                del _memory_cache[cache_key]
+                entry = None
+        if entry is not None:
+            return entry[1]
+        
+        if CACHE_DIR is None:
+            return None
+        try:
+            path = os.path.join(CACHE_DIR, namespace, f"{key}.json")
+            stat = os.stat(path)
+            if time.time() - stat.st_mtime > max_age:
+                return None
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            return None
+        
+        _memory_cache_put(cache_key, stat.st_mtime, value, stat.st_size)
+        return value
+    
+    def _cache_set(self, namespace, key, value):
+        """
+        Store a result in the cache
+        
+        Args:
+            namespace (str): Cache namespace (one subdirectory per kind of result)
+            key (str): Content hash identifying the result
+            value (str): Value to cache
+        """
+        if not self.use_cache:
+            return
+        
+        size = len(value) if isinstance(value, str) else len(_dumps(value))
+        _memory_cache_put((namespace, key), time.time(), value, size)
+        
+        if CACHE_DIR is None:
+            return
+        try:
+            directory = os.path.join(CACHE_DIR, namespace)
+            # Entries can hold uploaded document text, so keep them private to this user
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            # Write to a temporary file and rename it so readers never see a partial entry
+            with tempfile.NamedTemporaryFile('w', encoding='utf-8', dir=directory, delete=False) as f:
+                json.dump(value, f)
+            os.replace(f.name, os.path.join(directory, f"{key}.json"))
+        except OSError as e:
+            print(f"Error writing cache entry: {e}")
+        _prune_disk_cache()
+    
     def extract_text_from_pdf(self, pdf_content):
         """
         Extract text from PDF content
@@ -40,18 +945,51 @@ class PerplexityComplianceEvaluator:
         Returns:
             str: Extracted text
         """
+        cache_key = _content_key(pdf_content)
+        cached_text = self._cache_get("pdf_text", cache_key)
+        if cached_text is not None:
+            return cached_text
+        
         try:
-            # First try PyPDF2
-            pdf_reader = PyPDF2.PdfReader(io.BytesIO(pdf_content))
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                text += pdf_reader.pages[page_num].extract_text() + "\n"
+            # First try the PDF's own text layer; MuPDF parses it in C, far faster than
+            # a pure-Python reader. Scanned pages have no fonts and no text layer
+            page_texts = []
+            scanned_pages = []
+            ocr_failed = False
+            with fitz.open(stream=pdf_content, filetype="pdf") as pdf_document:
+                for page_num, page in enumerate(pdf_document):
+                    page_text = page.get_text()
+                    page_texts.append(page_text)
+                    if _page_is_scanned(page, page_text):
+                        scanned_pages.append(page_num)
+                
+                if scanned_pages and len(scanned_pages) == len(page_texts):
+                    print("PDF appears to be scanned. Using OCR...")
+                    return self.ocr_pdf(pdf_content)
+                
+                if scanned_pages:
+                    # Born-digital PDF with some scanned pages: OCR only those pages and
+                    # keep the text layer of the rest
+                    print(f"OCR'ing {len(scanned_pages)} scanned page(s)...")
+                    try:
+                        pdf_document.select(scanned_pages)
+                        ocr_texts = self._ocr_pages(pdf_document.tobytes())
+                        for page_num, ocr_text in zip(scanned_pages, ocr_texts):
+                            page_texts[page_num] = ocr_text
+                    except Exception as e:
+                        # Use the text without those pages for now, but do not cache
+                        # it, so the next upload of this PDF tries the OCR again
+                        print(f"Error performing OCR on scanned pages: {e}")
+                        ocr_failed = True
+            text = "".join(page_text + "\n" for page_text in page_texts)
             
             # If the extracted text is too short, try OCR
             if len(text.strip()) < 100:
-                print("Text extraction with PyPDF2 yielded limited results. Trying OCR...")
+                print("Text extraction with PyMuPDF yielded limited results. Trying OCR...")
                 return self.ocr_pdf(pdf_content)
             
+            if not ocr_failed:
+                self._cache_set("pdf_text", cache_key, text)
             return text
         except Exception as e:
             print(f"Error extracting text from PDF: {e}")
@@ -68,17 +1006,12 @@ class PerplexityComplianceEvaluator:
             str: OCR'd text
         """
         try:
-            text = ""
-            # Create temporary files for the images
-            with tempfile.TemporaryDirectory() as temp_dir:
-                # Convert PDF to images
-                images = convert_from_bytes(pdf_content)
-                for i, image in enumerate(images):
-                    # Save the image temporarily
-                    image_path = os.path.join(temp_dir, f'page_{i}.png')
-                    image.save(image_path, 'PNG')
-                    # Perform OCR
-                    text += pytesseract.image_to_string(image_path) + "\n"
+            cache_key = _content_key(pdf_content)
+            text = self._cache_get("ocr", cache_key)
+            if text is None:
+                text = "".join(page_text + "\f\n" for page_text in self._ocr_pages(pdf_content))
+                if text.strip():
+                    self._cache_set("ocr", cache_key, text)
             
             # If the Mistral API client is available, use it to enhance the OCR results
             if self.mistral_client and text.strip():
@@ -90,6 +1023,42 @@ class PerplexityComplianceEvaluator:
         except Exception as e:
             print(f"Error performing OCR on PDF: {e}")
             return ""
+    
+    def _ocr_pages(self, pdf_content):
+        """
+        Run tesseract over every page of a PDF
+        
+        Args:
+            pdf_content (bytes): PDF file content
+            
+        Returns:
+            list: Raw OCR'd text of each page, in page order
+        """
+        page_count = pdfinfo_from_bytes(pdf_content)["Pages"]
+        
+        # Pages are split into consecutive batches, one per worker, and each batch is
+        # recognized by a single tesseract engine, so the start-up cost is paid once
+        # per batch instead of once per page
+        batch_size = min(OCR_BATCH_PAGES, max(1, -(-page_count // OCR_MAX_WORKERS)))
+        
+        # Create temporary files for the images
+        with tempfile.TemporaryDirectory() as temp_dir:
+            # Each batch is rasterized by one pdftoppm process and then OCR'd on the
+            # shared pool, so batches of one document overlap each other while the
+            # process as a whole never runs more than OCR_MAX_WORKERS at once
+            futures = [
+                _ocr_executor.submit(_ocr_page_range, pdf_content, temp_dir,
+                                     first_page, min(first_page + batch_size - 1, page_count))
+                for first_page in range(1, page_count + 1, batch_size)
+            ]
+            try:
+                # Batches join in page order
+                return [page_text for future in futures for page_text in future.result()]
+            finally:
+                # Never remove the images from under a batch that is still running
+                for future in futures:
+                    future.cancel()
+                wait(futures)
             
     def enhance_ocr_with_mistral(self, ocr_text):
         """
@@ -104,26 +1073,43 @@ class PerplexityComplianceEvaluator:
         try:
             if not self.mistral_client:
                 return ocr_text
-                
-            # Prepare the prompt for Mistral
-            prompt = f"""I need help cleaning and structuring OCR text extracted from a financial or compliance document. 
+            
+            # Key on the model and chunking as well as the text so changing either
+            # invalidates entries
+            cache_key = _content_key(
+                f"{MISTRAL_MODEL}\n{MISTRAL_OCR_INPUT_TOKENS}\n{MISTRAL_OCR_MAX_CHUNKS}\n{ocr_text}".encode('utf-8')
+            )
+            cached_text = self._cache_get("mistral_ocr", cache_key)
+            if cached_text is not None:
+                return cached_text
+            
+            # Split on paragraph boundaries into chunks within the input budget; the
+            # cleaned text comes back at roughly the same length
+            chunks = _split_by_tokens(ocr_text, MISTRAL_OCR_INPUT_TOKENS)
+            ocr_inputs = chunks[:MISTRAL_OCR_MAX_CHUNKS]
+            print(f"Enhancing OCR text with Mistral (~{_estimate_tokens(ocr_text)} tokens in "
+                  f"{len(ocr_inputs)} of {len(chunks)} chunk(s))")
+            
+            # Prepare the prompts for Mistral
+            prompts = []
+            for ocr_input in ocr_inputs:
+                input_tokens = _estimate_tokens(ocr_input)
+                prompt = f"""I need help cleaning and structuring OCR text extracted from a financial or compliance document. 
             The text may have errors, missing spaces, or formatting issues. Please fix any obvious OCR errors, 
             add proper spacing and paragraph breaks, and format the document in a readable way. 
             Focus especially on numbers, dates, and financial terms which might be critical.
 
             Here is the raw OCR text:
             
-            {ocr_text[:4000]}  # Limit text to avoid token limits
+            {ocr_input}
             """
+                prompts.append((prompt, input_tokens + input_tokens // 4 + 64))
             
-            chat_response = self.mistral_client.chat.complete(
-                model="mistral-large-latest",
-                messages = [{"role": "user", "content": prompt}],
-                temperature=0.1,
-                max_tokens=4000
-            )
-            
-            return chat_response.choices[0].message.content
+            # Chunks are independent round-trips, so clean them up concurrently
+            enhanced_chunks = self._mistral_complete_all(prompts)
+            enhanced_text = "\n\n".join(enhanced_chunks + chunks[MISTRAL_OCR_MAX_CHUNKS:])
+            self._cache_set("mistral_ocr", cache_key, enhanced_text)
+            return enhanced_text
         except Exception as e:
             print(f"Error enhancing OCR with Mistral: {e}")
             return ocr_text
@@ -138,44 +1124,10 @@ class PerplexityComplianceEvaluator:
         Returns:
             str: Extracted and analyzed document text
         """
-        if not documents:
-            return ""
-            
-        all_text = ""
-        
-        for doc in documents:
-            try:
-                file_name = doc.get('file_name', 'Unknown document')
-                content = doc.get('content')
-                
-                if not content:
-                    continue
-                    
-                # Convert base64 to bytes if needed
-                if isinstance(content, str) and content.startswith('data:'):
-                    # Extract the base64 part
-                    content = content.split(',')[1]
-                    content = base64.b64decode(content)
-                elif isinstance(content, str):
-                    content = base64.b64decode(content)
-                
-                print(f"Processing document: {file_name}")
-                
-                # Handle PDF files
-                if file_name.lower().endswith('.pdf'):
-                    text = self.extract_text_from_pdf(content)
-                    all_text += f"\n\n--- Document: {file_name} ---\n\n{text}"
-                # Handle text files
-                elif file_name.lower().endswith(('.txt', '.md', '.csv')):
-                    text = content.decode('utf-8', errors='ignore')
-                    all_text += f"\n\n--- Document: {file_name} ---\n\n{text}"
-                # Add more file type handlers as needed
-                
-            except Exception as e:
-                print(f"Error processing document {file_name}: {e}")
+        all_text = self._extract_documents(documents)
         
         # If we have a lot of text and Mistral is available, summarize it
-        if len(all_text) > 10000 and self.mistral_client:
+        if self._should_summarize(all_text):
             try:
                 summary = self.summarize_with_mistral(all_text)
                 if summary:
@@ -185,6 +1137,84 @@ class PerplexityComplianceEvaluator:
                 
         return all_text
     
+    def _extract_documents(self, documents):
+        """
+        Extract the raw text of uploaded documents
+        
+        Args:
+            documents (list): List of document objects with content and file_name
+            
+        Returns:
+            str: Text of every readable document, each under a file name header
+        """
+        if not documents:
+            return ""
+            
+        # Each document is extracted independently (MuPDF, poppler and tesseract
+        # work mostly outside the GIL), so process them concurrently
+        with ThreadPoolExecutor(max_workers=min(len(documents), os.cpu_count() or 1)) as executor:
+            results = list(executor.map(self._process_document, documents))
+        
+        # Assemble the text in upload order with a single join
+        return "".join(
+            f"\n\n--- Document: {file_name} ---\n\n{text}"
+            for file_name, text in filter(None, results)
+        )
+    
+    def _should_summarize(self, document_text):
+        """Whether document text is long enough to be worth a Mistral summary"""
+        return len(document_text) > 10000 and self.mistral_client is not None
+    
+    def _process_document(self, doc):
+        """
+        Extract the text of a single uploaded document
+        
+        Args:
+            doc (dict): Document object with content and file_name
+            
+        Returns:
+            tuple: (file_name, text), or None if the document could not be used
+        """
+        file_name = 'Unknown document'
+        try:
+            file_name = doc.get('file_name', file_name)
+            content = doc.get('content')
+            
+            if not content:
+                return None
+            
+            # Check the file type first so unsupported uploads are never decoded
+            lower_name = file_name.lower()
+            is_pdf = lower_name.endswith('.pdf')
+            # Add more file type handlers as needed
+            if not is_pdf and not lower_name.endswith(('.txt', '.md', '.csv')):
+                return None
+                
+            # Convert base64 to bytes if needed; binary content is used as-is
+            if isinstance(content, str):
+                # Decode only the payload of a data: URI
+                if content.startswith('data:'):
+                    comma = content.find(',')
+                    if comma < 0:
+                        raise ValueError("data: URI has no payload")
+                    content = content[comma + 1:]
+                content = base64.b64decode(content)
+            elif isinstance(content, memoryview):
+                content = content.tobytes()
+            
+            print(f"Processing document: {file_name}")
+            
+            # Handle PDF files
+            if is_pdf:
+                return file_name, self.extract_text_from_pdf(content)
+            # Handle text files
+            return file_name, content.decode('utf-8', errors='ignore')
+            
+        except Exception as e:
+            print(f"Error processing document {file_name}: {e}")
+        
+        return None
+    
     def summarize_with_mistral(self, text):
         """
         Summarize text using Mistral AI
@@ -200,32 +1230,10 @@ class PerplexityComplianceEvaluator:
                 return ""
                 
             # Prepare chunks of text to handle large documents
-            chunks = [text[i:i+8000] for i in range(0, len(text), 8000)]
-            summaries = []
-            
-            for i, chunk in enumerate(chunks):
-                prompt = f"""You are a financial and regulatory specialist. 
-                Please extract and summarize all key financial and compliance information from this document.
-                Focus on identifying:
-                1. Financial metrics and data
-                2. Regulatory requirements mentioned
-                3. Compliance status indicators
-                4. Risk factors
-                5. Deadlines or important dates
-                
-                This is chunk {i+1} of {len(chunks)} from the full document:
-                
-                {chunk}
-                """
-                
-                chat_response = self.mistral_client.chat.complete(
-                    model="mistral-large-latest",
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.1,
-                    max_tokens=2000
-                )
-                
-                summaries.append(chat_response.choices[0].message.content)
+            chunks = _split_by_tokens(text, MISTRAL_CHUNK_TOKENS)
+            print(f"Summarizing ~{_estimate_tokens(text)} tokens with Mistral in {len(chunks)} chunk(s)")
+            # Chunks are independent network round-trips, so summarize them concurrently
+            summaries = self._summarize_chunks(chunks)
                 
             # If we have multiple summaries, combine them
             if len(summaries) > 1:
@@ -239,14 +1247,7 @@ class PerplexityComplianceEvaluator:
                 {combined_summary}
                 """
                 
-                chat_response = self.mistral_client.chat.complete(
-                    model="mistral-large-latest",
-                    messages=[{"role": "user", "content": meta_prompt}],
-                    temperature=0.1,
-                    max_tokens=3000
-                )
-                
-                return chat_response.choices[0].message.content
+                return self._mistral_complete(meta_prompt, MISTRAL_META_SUMMARY_MAX_TOKENS)
             else:
                 return summaries[0] if summaries else ""
                 
@@ -254,78 +1255,162 @@ class PerplexityComplianceEvaluator:
             print(f"Error summarizing with Mistral: {e}")
             return ""
     
-    def query_perplexity_api(self, query):
+    def _summarize_chunks(self, chunks):
+        """
+        Summarize text chunks concurrently using Mistral AI
+        
+        Args:
+            chunks (list): Text chunks to summarize
+            
+        Returns:
+            list: Chunk summaries, in the same order as the chunks
+        """
+        prompts = []
+        for i, chunk in enumerate(chunks):
+            prompt = f"""You are a financial and regulatory specialist. 
+            Please extract and summarize all key financial and compliance information from this document.
+            Focus on identifying:
+            1. Financial metrics and data
+            2. Regulatory requirements mentioned
+            3. Compliance status indicators
+            4. Risk factors
+            5. Deadlines or important dates
+            
+            This is chunk {i+1} of {len(chunks)} from the full document:
+            
+            {chunk}
+            """
+            prompts.append((prompt, MISTRAL_SUMMARY_MAX_TOKENS))
+        
+        return self._mistral_complete_all(prompts)
+    
+    def _mistral_complete_all(self, prompts):
+        """
+        Send several prompts to Mistral concurrently
+        
+        Every request still waits for one of the evaluator's _mistral_slots inside
+        _mistral_complete, so concurrent documents share the same budget.
+        
+        Args:
+            prompts (list): (prompt, max_tokens) pairs
+            
+        Returns:
+            list: Reply texts, in the same order as prompts
+        """
+        with ThreadPoolExecutor(max_workers=max(1, min(MISTRAL_MAX_CONCURRENCY, len(prompts)))) as executor:
+            return list(executor.map(lambda prompt: self._mistral_complete(*prompt), prompts))
+    
+    def _mistral_complete(self, prompt, max_tokens):
+        """
+        Send a single user prompt to Mistral
+        
+        Args:
+            prompt (str): Prompt text
+            max_tokens (int): Output token budget
+            
+        Returns:
+            str: Reply text
+        """
+        for attempt in range(MISTRAL_MAX_ATTEMPTS):
+            try:
+                with self._mistral_slots:
+                    chat_response = self.mistral_client.chat.complete(
+                        model=MISTRAL_MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        temperature=0.1,
+                        max_tokens=max_tokens
+                    )
+                return chat_response.choices[0].message.content
+            except Exception as e:
+                # Back off and retry when rate limited; anything else is the caller's problem
+                retry_after = _mistral_retry_after(e)
+                if retry_after is None or attempt == MISTRAL_MAX_ATTEMPTS - 1:
+                    raise
+                delay = _retry_delay(retry_after, attempt)
+                print(f"Mistral rate limited. Waiting {delay:.0f} seconds...")
+                time.sleep(delay)
+    
+    def query_perplexity_api(self, query, max_tokens=4000, use_cache=True):
         """
         Query the Perplexity API with the given prompt
         
         Args:
             query (str): Query to send to Perplexity API
+            max_tokens (int, optional): Output token budget for the response
+            use_cache (bool, optional): Reuse a cached response to an identical request
             
         Returns:
             dict: API response
         """
-        API_URL = "https://api.perplexity.ai/chat/completions"
-        
-        headers = {
-            "Authorization": f"Bearer {self.perplexity_api_key}",
-            "Content-Type": "application/json"
-        }
-        
-        # Use llama-3.1-sonar-large-128k-online model for comprehensive internet search
         payload = {
-            "model": "llama-3.1-sonar-large-128k-online",
-            "messages": [
-                {
-                    "role": "system", 
-                    "content": """You are a financial compliance expert who specializes in evaluating businesses against government regulations. 
-Your task is to analyze a company's financial data and provide a detailed compliance report with the following characteristics:
-
-1. ONLY cite official government websites, regulatory bodies, and authoritative legal sources
-2. Format your analysis as a professional Markdown document with proper headings, bullet points, and sections
-3. Include direct links to government websites and regulatory documents whenever possible
-4. Provide company-specific insights that directly address their unique situation
-5. Structure your response to be both comprehensive for professionals and understandable to non-experts
-6. When recommending solutions, be specific about implementation timelines, responsibilities, and expected outcomes
-7. Include a "References" section at the end with numbered citations to all government sources
-8. IMPORTANT: Provide a clear numerical compliance score from 0-100 in a section called "Compliance Score"
-
-Be thorough in your research and analysis. Use current regulations and requirements appropriate to the company's location and industry."""
-                },
-                {"role": "user", "content": query}
-            ],
+            "model": PERPLEXITY_MODEL,
+            "messages": [_PERPLEXITY_SYSTEM_MESSAGE, {"role": "user", "content": query}],
             "temperature": 0.1,  # Low temperature for factual responses
-            "max_tokens": 4000,  # Allow for comprehensive analysis
+            "max_tokens": max_tokens,  # Allow for comprehensive analysis
+            "stream": True,
         }
+        body = _dumps(payload)
         
-        try:
-            print("Sending request to Perplexity API...")
-            
-            response = requests.post(API_URL, headers=headers, json=payload)
-            
-            # Display status code
-            print(f"Response status code: {response.status_code}")
-            
-            # Handle error cases
-            if response.status_code != 200:
-                print(f"Error details: {response.text}")
-                raise requests.exceptions.HTTPError(f"API error: {response.status_code}")
+        # The serialized payload identifies the request; answer repeats from the cache
+        # until regulations may have moved on. The key is scoped to the API key, since
+        # the disk cache is shared by every evaluator
+        cache_key = _content_key(self._perplexity_cache_scope + body)
+        if use_cache:
+            cached_result = self._cache_get("perplexity", cache_key, max_age=PERPLEXITY_CACHE_TTL)
+            if cached_result is not None:
+                print("Using cached Perplexity response")
+                return cached_result
+        
+        request_tokens = _estimate_tokens(_PERPLEXITY_SYSTEM_MESSAGE["content"]) + _estimate_tokens(query) + max_tokens
+        for attempt in range(PERPLEXITY_MAX_ATTEMPTS):
+            last_attempt = attempt == PERPLEXITY_MAX_ATTEMPTS - 1
+            try:
+                # Pace requests to stay under the rate limit rather than wait out a 429
+                self._perplexity_limiter.acquire(request_tokens)
+                print("Sending request to Perplexity API...")
                 
-            response.raise_for_status()
-            
-            result = response.json()
-            return result
-        except requests.exceptions.HTTPError as e:
-            print(f"HTTP Error: {e}")
-            if response.status_code == 429:
-                print("Rate limited. Waiting 60 seconds...")
-                time.sleep(60)
-                return self.query_perplexity_api(query)
-            raise
-        except Exception as e:
-            print(f"Error querying Perplexity API: {e}")
-            raise
+                # Stream the completion so the read timeout applies between chunks
+                # rather than to the whole multi-thousand-token response
+                response = self._session.post(
+                    PERPLEXITY_API_URL, data=body, timeout=PERPLEXITY_TIMEOUT, stream=True
+                )
+                
+                # Display status code
+                print(f"Response status code: {response.status_code}")
+                
+                # Back off and retry when rate limited, honouring Retry-After if the API sends it
+                if response.status_code == 429 and not last_attempt:
+                    delay = _retry_delay(response.headers.get("Retry-After"), attempt)
+                    print(f"Rate limited. Waiting {delay:.0f} seconds...")
+                    response.close()
+                    time.sleep(delay)
+                    continue
+                
+                # Handle error cases
+                if response.status_code != 200:
+                    print(f"Error details: {response.text}")
+                    raise requests.exceptions.HTTPError(f"API error: {response.status_code}")
+                    
+                result = _read_completion_stream(response)
+                if use_cache:
+                    self._cache_set("perplexity", cache_key, result)
+                return result
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                if last_attempt:
+                    print(f"Error querying Perplexity API: {e}")
+                    raise
+                delay = _retry_delay(None, attempt)
+                print(f"Perplexity request failed ({e}). Retrying in {delay:.0f} seconds...")
+                time.sleep(delay)
+            except requests.exceptions.HTTPError as e:
+                print(f"HTTP Error: {e}")
+                raise
+            except Exception as e:
+                print(f"Error querying Perplexity API: {e}")
+                raise
     
-    def evaluate_compliance(self, company_data, jurisdiction, documents=None):
+    def evaluate_compliance(self, company_data, jurisdiction, documents=None, use_cache=True):
         """
         Evaluate the company's compliance with financial regulations
         
@@ -333,65 +1418,202 @@ Be thorough in your research and analysis. Use current regulations and requireme
             company_data (dict): Company profile data
             jurisdiction (str): Jurisdiction to analyze
             documents (list, optional): List of document objects
+            use_cache (bool, optional): Reuse a recent Perplexity report for an identical request
             
         Returns:
             dict: Evaluation results
         """
         # Process any documents first to extract text
-        document_text = ""
-        if documents:
-            document_text = self.analyze_documents(documents)
+        document_text = self._extract_documents(documents) if documents else ""
+        
+        company_name, company_location, profile = self._company_profile(company_data, jurisdiction, document_text)
+        
+        # Timestamp for the report date and the evaluation date
+        now = datetime.now()
+        
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            summary_future = self._start_document_summary(executor, document_text)
+            result = self._evaluate_profile(company_name, company_location, profile, jurisdiction, now, use_cache)
+            return self._add_document_summary(result, summary_future)
+    
+    def _start_document_summary(self, executor, document_text):
+        """
+        Start a Mistral summary of long document text
+        
+        The Perplexity query only carries an excerpt of the raw document text, so the
+        summary of the full documents runs alongside it instead of before it and is
+        patched into the finished report by _add_document_summary.
+        
+        Args:
+            executor (ThreadPoolExecutor): Executor to run the summary on
+            document_text (str): Text from _extract_documents
+            
+        Returns:
+            Future: The summary, or None if the text is not worth summarizing
+        """
+        if not self._should_summarize(document_text):
+            return None
+        return executor.submit(self.summarize_with_mistral, document_text)
+    
+    def _add_document_summary(self, result, summary_future):
+        """
+        Insert a document summary after the report header of an evaluation result
+        
+        Args:
+            result (dict): Evaluation results
+            summary_future (Future): Summary from _start_document_summary, or None
+            
+        Returns:
+            dict: The evaluation results, with a documentSummary if one was produced
+        """
+        summary = summary_future.result() if summary_future is not None else ""
+        
+        if summary and "content" in result:
+            section = f"## Document Summary\n\n{summary.strip()}\n\n"
+            content, inserted = _REPORT_HEADER_RE.subn(lambda match: match.group(1) + section, result["content"], count=1)
+            result["content"] = content if inserted else section + content
+            result["summary"] = f"{result['summary']}\n\n**Document Summary**\n\n{summary.strip()}"
+            result["documentSummary"] = summary
+        return result
+    
+    def evaluate_jurisdiction(self, company_profile, jurisdiction_id, use_cache=True):
+        """
+        Evaluate a company profile, as sent by the frontend, against one jurisdiction
+        
+        Args:
+            company_profile (dict): Company profile with companyName, companySize,
+                industry and description
+            jurisdiction_id (str): Jurisdiction ID, such as 'us' or 'eu'
+            use_cache (bool, optional): Reuse a recent Perplexity report for an identical request
+            
+        Returns:
+            dict: Evaluation results, carrying an "error" key if the evaluation failed
+        """
+        return self.evaluate_compliance(company_profile, jurisdiction_id, use_cache=use_cache)
+    
+    def evaluate_compliance_batch(self, companies, use_cache=True):
+        """
+        Evaluate several companies with as few Perplexity requests as possible
+        
+        Up to BATCH_MAX_COMPANIES small profiles are packed into one prompt that asks for
+        a JSON array of reports. Profiles longer than BATCH_MAX_PROFILE_CHARS, and batches
+        whose response cannot be parsed, are evaluated one company at a time.
+        
+        Args:
+            companies (list): Dicts with company_data, jurisdiction and optional documents
+            use_cache (bool, optional): Reuse recent Perplexity reports for identical requests
+            
+        Returns:
+            list: Evaluation results, in the same order as companies
+        """
+        results = [None] * len(companies)
+        summary_futures = [None] * len(companies)
+        now = datetime.now()
         
+        # Document summaries are patched in afterwards, exactly as in evaluate_compliance,
+        # and run alongside the Perplexity requests; _mistral_slots bounds them together
+        with ThreadPoolExecutor(max_workers=MISTRAL_MAX_CONCURRENCY) as executor:
+            pending = []
+            for index, company in enumerate(companies):
+                jurisdiction = company['jurisdiction']
+                documents = company.get('documents')
+                document_text = self._extract_documents(documents) if documents else ""
+                summary_futures[index] = self._start_document_summary(executor, document_text)
+                company_name, company_location, profile = self._company_profile(
+                    company['company_data'], jurisdiction, document_text
+                )
+                
+                if len(profile) > BATCH_MAX_PROFILE_CHARS:
+                    results[index] = self._evaluate_profile(
+                        company_name, company_location, profile, jurisdiction, now, use_cache
+                    )
+                else:
+                    pending.append((index, company_name, company_location, profile, jurisdiction))
+            
+            for start in range(0, len(pending), BATCH_MAX_COMPANIES):
+                batch = pending[start:start + BATCH_MAX_COMPANIES]
+                reports = self._query_batch(batch, use_cache) if len(batch) > 1 else None
+                
+                for position, (index, company_name, company_location, profile, jurisdiction) in enumerate(batch):
+                    if reports is None:
+                        results[index] = self._evaluate_profile(
+                            company_name, company_location, profile, jurisdiction, now, use_cache
+                        )
+                        continue
+                    try:
+                        results[index] = self._build_evaluation(reports[position], company_name, jurisdiction, now)
+                    except Exception as e:
+                        results[index] = self._evaluation_error(e, jurisdiction)
+            
+            return [self._add_document_summary(result, future) for result, future in zip(results, summary_futures)]
+    
+    def _company_profile(self, company_data, jurisdiction, document_text):
+        """
+        Build the Markdown company profile sent to Perplexity
+        
+        Args:
+            company_data (dict): Company profile data
+            jurisdiction (str): Jurisdiction to analyze
+            document_text (str): Text extracted from the company's documents
+            
+        Returns:
+            tuple: (company_name, company_location, profile Markdown)
+        """
         # Extract key information from company data
         company_name = company_data.get('companyName', '')
         company_description = company_data.get('description', '')
         
         # Get location based on jurisdiction
-        jurisdiction_mapping = {
-            'us': 'United States',
-            'uk': 'United Kingdom',
-            'eu': 'European Union',
-            'ca': 'Canada',
-            'au': 'Australia',
-            'sg': 'Singapore',
-            'hk': 'Hong Kong'
-        }
-        company_location = jurisdiction_mapping.get(jurisdiction.lower(), jurisdiction)
+        company_location = JURISDICTION_NAMES.get(jurisdiction.lower(), jurisdiction)
         
         industry = company_data.get('industry', '')
         company_size = company_data.get('companySize', '')
         
-        # Today's date for the report
-        today = datetime.now().strftime("%Y-%m-%d")
-        
         # Construct comprehensive financial data section from the company data
-        financial_data = "## Company Information:\n\n"
+        financial_lines = ["## Company Information:\n\n"]
         
         # Add fields that exist in the company data
         if company_name:
-            financial_data += f"- **Company Name**: {company_name}\n"
+            financial_lines.append(f"- **Company Name**: {company_name}\n")
         if company_size:
-            financial_data += f"- **Company Size**: {company_size}\n"
+            financial_lines.append(f"- **Company Size**: {company_size}\n")
         if industry:
-            financial_data += f"- **Industry**: {industry}\n"
+            financial_lines.append(f"- **Industry**: {industry}\n")
         if company_location:
-            financial_data += f"- **Primary Jurisdiction**: {company_location}\n"
+            financial_lines.append(f"- **Primary Jurisdiction**: {company_location}\n")
             
         if company_description:
-            financial_data += f"\n**Description**: {company_description}\n"
+            financial_lines.append(f"\n**Description**: {company_description}\n")
+        financial_data = "".join(financial_lines)
         
         # Add document content if available
         document_section = ""
         if document_text:
             document_section = f"\n\n## Document Analysis\n\nThe following information was extracted from the provided documents:\n\n{document_text[:2000]}...\n\n"
         
+        return company_name, company_location, f"{financial_data}\n{document_section}"
+    
+    def _evaluate_profile(self, company_name, company_location, profile, jurisdiction, now, use_cache=True):
+        """
+        Run a single-company Perplexity evaluation
+        
+        Args:
+            company_name (str): Company name
+            company_location (str): Display name of the jurisdiction
+            profile (str): Company profile Markdown from _company_profile
+            jurisdiction (str): Jurisdiction to analyze
+            now (datetime): When the evaluation started
+            use_cache (bool, optional): Reuse a cached Perplexity response
+            
+        Returns:
+            dict: Evaluation results
+        """
         # Construct the query for Perplexity API
         query = f"""
 # Financial Compliance Evaluation Request
 
 ## Company Profile
-{financial_data}
-{document_section}
+{profile}
 
 ## Evaluation Request
 
@@ -415,57 +1637,138 @@ Focus on providing deep insights specific to this company, not generic complianc
         print("Evaluating financial compliance...")
         
         try:
-            result = self.query_perplexity_api(query)
+            result = self.query_perplexity_api(query, use_cache=use_cache)
             
             # Extract the content from the API response
             content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
             
-            # Process the content to ensure proper Markdown formatting
-            processed_content = self.process_markdown_content(content, company_name, today, jurisdiction)
-            
-            # Extract compliance score, status, risk level, and requirements
-            compliance_score = self.extract_compliance_score(processed_content)
-            compliance_status = self.determine_compliance_status(compliance_score)
-            risk_level = self.determine_risk_level(compliance_score)
-            requirements = self.extract_requirements(processed_content)
-            
-            # Generate a summary section
-            summary = self.generate_summary(processed_content)
-            
-            # Return results
-            return {
-                "jurisdictionId": jurisdiction,
-                "jurisdictionName": jurisdiction_mapping.get(jurisdiction.lower(), jurisdiction),
-                "companyName": company_name,
-                "evaluation_date": datetime.now().isoformat(),
-                "content": processed_content,
-                "summary": summary,
-                "complianceScore": compliance_score,
-                "status": compliance_status,
-                "riskLevel": risk_level,
-                "requirements": {
-                    "total": len(requirements),
-                    "met": sum(1 for req in requirements if req.get('status') == 'met'),
-                },
-                "requirementsList": requirements,
-                "recommendations": self.extract_recommendations(processed_content),
-                "regulatoryReferences": self.extract_regulatory_references(processed_content)
-            }
+            return self._build_evaluation(content, company_name, jurisdiction, now)
+            
+        except Exception as e:
+            return self._evaluation_error(e, jurisdiction)
+    
+    def _query_batch(self, batch, use_cache=True):
+        """
+        Request reports for several companies in one Perplexity call
+        
+        Args:
+            batch (list): (index, company_name, company_location, profile, jurisdiction) tuples
+            use_cache (bool, optional): Reuse a cached Perplexity response
+            
+        Returns:
+            list: One Markdown report per company, or None if the response was unusable
+        """
+        company_sections = "".join(
+            f"\n### Company {i}\n\n**Evaluate against regulations in**: {company_location}\n\n{profile}\n"
+            for i, (_, _, company_location, profile, _) in enumerate(batch, 1)
+        )
+        
+        query = f"""
+# Financial Compliance Evaluation Request
+
+Evaluate each of the {len(batch)} companies below independently.
+{company_sections}
+## Evaluation Request
+
+For each company, write a markdown report on its compliance with financial regulations in the stated jurisdiction. Each report should:
+
+1. Identify the relevant financial regulations for the company based on its location, industry, and size
+2. Analyze the company's current compliance status and identify specific gaps and risks
+3. Provide actionable recommendations with implementation steps
+4. Include citations to official government websites and regulatory resources
+
+IMPORTANT: Each report must include a dedicated section titled "Compliance Score" with a numerical score from 0-100, and indicate whether it represents "compliant" (80-100), "partial" (40-79), or "non-compliant" (0-39) status.
+
+Only cite official government websites, regulatory bodies, and authoritative legal sources. Do not make up or assume information not provided about a company.
+
+Return ONLY a JSON array of {len(batch)} strings, in company order, where each string is the complete Markdown report for that company.
+        """
+        
+        print(f"Evaluating financial compliance for {len(batch)} companies in one request...")
+        
+        try:
+            result = self.query_perplexity_api(query, max_tokens=BATCH_REPORT_TOKENS * len(batch), use_cache=use_cache)
+            content = result.get('choices', [{}])[0].get('message', {}).get('content', '')
             
+            # Tolerate code fences or prose around the array
+            reports = json.loads(content[content.index('['):content.rindex(']') + 1])
+            if len(reports) != len(batch) or not all(isinstance(report, str) for report in reports):
+                raise ValueError(f"expected {len(batch)} reports, got {len(reports)}")
+            return reports
         except Exception as e:
-            print(f"Error in compliance evaluation: {e}")
-            import traceback
-            traceback.print_exc()
-            return {
-                "error": str(e),
-                "jurisdictionId": jurisdiction,
-                "jurisdictionName": jurisdiction_mapping.get(jurisdiction.lower(), jurisdiction),
-                "complianceScore": 0,
-                "status": "non-compliant",
-                "riskLevel": "high",
-                "requirements": {"total": 0, "met": 0},
-                "requirementsList": []
-            }
+            print(f"Batch evaluation failed, evaluating companies individually: {e}")
+            return None
+    
+    def _build_evaluation(self, content, company_name, jurisdiction, now):
+        """
+        Turn a Perplexity report into the evaluation result returned to callers
+        
+        Args:
+            content (str): Raw Markdown report
+            company_name (str): Company name
+            jurisdiction (str): Jurisdiction analyzed
+            now (datetime): When the evaluation started
+            
+        Returns:
+            dict: Evaluation results
+        """
+        # Process the content to ensure proper Markdown formatting
+        processed_content = self.process_markdown_content(content, company_name, now.strftime("%Y-%m-%d"), jurisdiction)
+        
+        # Extract compliance score, status, risk level, and structured sections
+        compliance_score = self.extract_compliance_score(processed_content)
+        compliance_status = self.determine_compliance_status(compliance_score)
+        risk_level = self.determine_risk_level(compliance_score)
+        structured = self.extract_structured(processed_content, compliance_score)
+        requirements = structured["requirements"]
+        
+        # Generate a summary section
+        summary = self.generate_summary(processed_content)
+        
+        # Return results
+        return {
+            "jurisdictionId": jurisdiction,
+            "jurisdictionName": JURISDICTION_NAMES.get(jurisdiction.lower(), jurisdiction),
+            "companyName": company_name,
+            "evaluation_date": now.isoformat(),
+            "content": processed_content,
+            "summary": summary,
+            "complianceScore": compliance_score,
+            "status": compliance_status,
+            "riskLevel": risk_level,
+            "requirements": {
+                "total": len(requirements),
+                "met": sum(1 for req in requirements if req.get('status') == 'met'),
+            },
+            "requirementsList": requirements,
+            "recommendations": structured["recommendations"],
+            "regulatoryReferences": structured["references"]
+        }
+    
+    def _evaluation_error(self, e, jurisdiction):
+        """
+        Build the result returned when an evaluation fails
+        
+        Args:
+            e (Exception): The error raised
+            jurisdiction (str): Jurisdiction being analyzed
+            
+        Returns:
+            dict: Non-compliant placeholder result carrying the error message
+        """
+        print(f"Error in compliance evaluation: {e}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "error": str(e),
+            "jurisdictionId": jurisdiction,
+            "jurisdictionName": JURISDICTION_NAMES.get(jurisdiction.lower(), jurisdiction),
+            "complianceScore": 0,
+            "status": "non-compliant",
+            "riskLevel": "high",
+            "requirements": {"total": 0, "met": 0},
+            "requirementsList": []
+        }
     
     def process_markdown_content(self, content, company_name, date, jurisdiction):
         """
@@ -482,33 +1785,41 @@ Focus on providing deep insights specific to this company, not generic complianc
         """
         # Add report header if not present
         if not content.startswith("# Financial Compliance Evaluation"):
-            header = f"# Financial Compliance Evaluation for {company_name} in {jurisdiction.upper()}\n\n"
-            header += f"**Date**: {date}\n\n"
+            header = f"# Financial Compliance Evaluation for {company_name} in {jurisdiction.upper()}\n\n**Date**: {date}\n\n"
             content = header + content
             
-        # Ensure citations are properly formatted and collected at the end
-        citation_pattern = r'\[([^\]]+)\]\((https?://[^\)]+)\)'
-        citations = re.findall(citation_pattern, content)
-        
-        # Check if we have a references section already
-        if not re.search(r'# References|## References', content, re.IGNORECASE):
-            # Add references section
-            content += "\n\n## References\n\n"
-            
-            # Add numbered references
-            for i, (text, url) in enumerate(citations, 1):
-                if url.startswith(("http://", "https://")):
-                    # Check if it's a government URL
-                    domain = url.split('/')[2]
-                    if ('.gov.' in domain or domain.endswith('.gov')):
-                        content += f"{i}. [{text}]({url}) - Official Government Source\n"
-                    else:
-                        content += f"{i}. [{text}]({url})\n"
+        # The heading checks below only run their IGNORECASE patterns once a hint is
+        # found in this lowercased copy
+        content_lc = content.lower()
+        
+        # Ensure citations are properly formatted and collected at the end,
+        # unless we have a references section already
+        if not ("# reference" in content_lc and _REFERENCES_HEADING_RE.search(content)):
+            # Add references section; lines are collected and appended once rather
+            # than copying the whole report for every citation
+            reference_lines = ["\n\n## References\n\n"]
+            
+            # Add numbered references, listing each cited URL once in order of first
+            # appearance; reports often cite the same source several times
+            seen_urls = set()
+            for match in _CITATION_RE.finditer(content):
+                text, url = match.groups()
+                if url in seen_urls:
+                    continue
+                seen_urls.add(url)
+                
+                # Check if it's a government URL
+                if _is_government_url(url):
+                    reference_lines.append(f"{len(seen_urls)}. [{text}]({url}) - Official Government Source\n")
+                else:
+                    reference_lines.append(f"{len(seen_urls)}. [{text}]({url})\n")
+            references = "".join(reference_lines)
+            content += references
+            content_lc += references.lower()
             
         # Ensure there's a clear executive summary
-        if not re.search(r'## Executive Summary|## Summary', content, re.IGNORECASE):
-            content = re.sub(r'(# Financial Compliance Evaluation.*?\n\n\*\*Date\*\*:.*?\n\n)', 
-                            r'\1## Executive Summary\n\nThis report evaluates the financial compliance status of ' + 
+        if not ("ummary" in content_lc and _SUMMARY_HEADING_RE.search(content)):
+            content = _REPORT_HEADER_RE.sub(r'\1## Executive Summary\n\nThis report evaluates the financial compliance status of ' + 
                             company_name + ' against applicable regulations. The evaluation identifies key compliance ' +
                             'issues and provides specific recommendations for achieving full compliance.\n\n', 
                             content)
@@ -525,33 +1836,27 @@ Focus on providing deep insights specific to this company, not generic complianc
         Returns:
             int: Compliance score (0-100)
         """
+        content_lc = content.lower()
+        
         # Look for a dedicated compliance score section
-        score_section_match = re.search(r'## Compliance Score\s*(.*?)(?=\n## |\n# |$)', 
-                                     content, re.DOTALL | re.IGNORECASE)
+        score_section_match = _SCORE_SECTION_HINT in content_lc and _SCORE_SECTION_RE.search(content)
         
         if score_section_match:
-            score_text = score_section_match.group(1)
-            # Extract numbers from the text
-            score_matches = re.findall(r'(\d+)(?:\s*\/\s*100|\s*percent|\s*%)', score_text)
-            if score_matches:
-                return int(score_matches[0])
+            # Extract the first number from the text
+            score_match = _SCORE_VALUE_RE.search(score_section_match.group(1))
+            if score_match:
+                return int(score_match.group(1))
         
         # If no dedicated section, look for score mentions
-        score_mentions = re.findall(r'compliance\s+score\s+(?:is|of)\s+(\d+)(?:\s*\/\s*100|\s*percent|\s*%)', 
-                                  content, re.IGNORECASE)
+        score_mention = _SCORE_MENTION_HINT in content_lc and _SCORE_MENTION_RE.search(content)
         
-        if score_mentions:
-            return int(score_mentions[0])
+        if score_mention:
+            return int(score_mention.group(1))
         
         # If all else fails, try to infer from "compliant", "partially compliant", "non-compliant" mentions
-        if re.search(r'fully\s+compliant|complete\s+compliance', content, re.IGNORECASE):
-            return 90
-        elif re.search(r'largely\s+compliant|mostly\s+compliant', content, re.IGNORECASE):
-            return 75
-        elif re.search(r'partially\s+compliant|partial\s+compliance', content, re.IGNORECASE):
-            return 50
-        elif re.search(r'non.?compliant|not\s+compliant', content, re.IGNORECASE):
-            return 20
+        for hints, pattern, score in _COMPLIANCE_WORDING_SCORES:
+            if _mentions_any(content_lc, hints) and pattern.search(content):
+                return score
         
         # Default to a middle value if we can't determine
         return 50
@@ -600,8 +1905,9 @@ Focus on providing deep insights specific to this company, not generic complianc
         Returns:
             str: Summary text
         """
-        # Try to extract the executive summary
-        summary_match = re.search(r'## Executive Summary\s*(.*?)(?=\n## |\n# )', content, re.DOTALL | re.IGNORECASE)
+        # Try to extract the executive summary, running the IGNORECASE pattern only
+        # when the heading can be present
+        summary_match = "## exec" in content.lower() and _EXECUTIVE_SUMMARY_RE.search(content)
         if summary_match:
             return summary_match.group(1).strip()
         else:
@@ -619,109 +1925,118 @@ Focus on providing deep insights specific to this company, not generic complianc
             else:
                 return "Please refer to the full compliance evaluation report for detailed analysis."
     
-    def extract_requirements(self, content):
+    def extract_structured(self, content, score=None):
+        """
+        Extract requirements, recommendations and references from one section split
+        
+        Args:
+            content (str): Markdown content
+            score (int, optional): Compliance score already extracted from content
+            
+        Returns:
+            dict: Lists under "requirements", "recommendations" and "references"
+        """
+        sections = _split_sections(content)
+        return {
+            "requirements": self.extract_requirements(content, sections, score),
+            "recommendations": self.extract_recommendations(content, sections),
+            "references": self.extract_regulatory_references(content, sections)
+        }
+    
+    def extract_requirements(self, content, sections=None, score=None):
         """
         Extract compliance requirements from the evaluation
         
         Args:
             content (str): Markdown content
+            sections (dict, optional): Pre-split sections from _split_sections
+            score (int, optional): Compliance score already extracted from content
             
         Returns:
             list: Requirements
         """
-        requirements = []
+        # Requirements are collected column by column and turned into dicts once at the end
+        descriptions, statuses, categories, risks = [], [], [], []
+        if sections is None:
+            sections = _split_sections(content)
         
         # Look for a requirements section
-        req_section_match = re.search(r'## (?:Requirements|Regulations?|Compliance Requirements?|Regulatory Requirements?)\s*(.*?)(?=\n## |\n# |$)', 
-                                     content, re.DOTALL | re.IGNORECASE)
+        req_text = _find_section(sections, _REQUIREMENTS_HEADINGS)
         
-        if req_section_match:
-            req_text = req_section_match.group(1).strip()
+        if req_text is not None:
             
             # Extract bullet points or numbered items
-            req_items = re.findall(r'^(?:\d+\.|\*|\-)\s*(.*?)$', req_text, re.MULTILINE)
+            req_items = _find_bullets(req_text)
             
             if req_items:
-                for item in req_items:
-                    # Try to determine status
-                    status = "not-met"  # Default
-                    if re.search(r'compliant|in compliance|meets? requirements?', item, re.IGNORECASE):
-                        status = "met"
-                    elif re.search(r'partially|in progress|some compliance', item, re.IGNORECASE):
-                        status = "partial"
-                        
-                    # Try to determine category
-                    category = "General"
-                    for cat in ["Tax", "Reporting", "Financial", "Data Protection", "Employment", "Banking", "Securities", "Environmental", "Health"]:
-                        if re.search(cat, item, re.IGNORECASE):
-                            category = cat
-                            break
-                    
-                    # Try to determine risk
-                    risk = "medium"  # Default
-                    if re.search(r'high risk|severe|critical', item, re.IGNORECASE):
-                        risk = "high"
-                    elif re.search(r'low risk|minor', item, re.IGNORECASE):
-                        risk = "low"
-                    
-                    requirements.append({
-                        "title": item[:50] + "..." if len(item) > 50 else item,
-                        "description": item,
-                        "category": category,
-                        "status": status,
-                        "risk": risk,
-                        "id": f"req-{len(requirements) + 1}"
-                    })
+                # Determine status, category and risk for all items together
+                item_statuses, item_categories, item_risks = _classify_items(req_items)
+                descriptions.extend(req_items)
+                statuses.extend(item_statuses)
+                categories.extend(item_categories)
+                risks.extend(item_risks)
             else:
                 # If no bullet points, try to split by sentences
-                sentences = re.split(r'(?<=[.!?])\s+', req_text)
-                for i, sentence in enumerate(sentences):
-                    if len(sentence.strip()) > 10:  # Avoid very short fragments
-                        requirements.append({
-                            "title": sentence[:50] + "..." if len(sentence) > 50 else sentence,
-                            "description": sentence,
-                            "category": "General",
-                            "status": "not-met",
-                            "risk": "medium",
-                            "id": f"req-{len(requirements) + 1}"
-                        })
+                # Avoid very short fragments; the raw length check rejects most of them
+                # without allocating a stripped copy
+                sentences = [sentence for sentence in _split_sentences(req_text)
+                             if len(sentence) > 10 and len(sentence.strip()) > 10]
+                descriptions.extend(sentences)
+                statuses.extend(["not-met"] * len(sentences))
+                categories.extend(["General"] * len(sentences))
+                risks.extend(["medium"] * len(sentences))
         
         # If no requirements found yet, try looking in other sections
-        if not requirements:
+        if not descriptions:
             # Try looking in a "Findings" or "Analysis" section
-            findings_section_match = re.search(r'## (?:Findings|Analysis|Assessment|Evaluation)\s*(.*?)(?=\n## |\n# |$)', 
-                                             content, re.DOTALL | re.IGNORECASE)
+            findings_text = _find_section(sections, _FINDINGS_HEADINGS)
             
-            if findings_section_match:
-                findings_text = findings_section_match.group(1).strip()
-                
-                # Extract bullet points or numbered items
-                findings_items = re.findall(r'^(?:\d+\.|\*|\-)\s*(.*?)$', findings_text, re.MULTILINE)
-                
-                if findings_items:
-                    for item in findings_items:
-                        # Filter out items that aren't likely to be requirements
-                        if len(item.strip()) < 10 or not re.search(r'require|regulat|comply|law|rule', item, re.IGNORECASE):
-                            continue
-                            
-                        status = "not-met"
-                        if re.search(r'compliant|in compliance|meets? requirements?', item, re.IGNORECASE):
-                            status = "met"
-                        elif re.search(r'partially|in progress|some compliance', item, re.IGNORECASE):
-                            status = "partial"
-                            
-                        requirements.append({
-                            "title": item[:50] + "..." if len(item) > 50 else item,
-                            "description": item,
-                            "category": "General",
-                            "status": status,
-                            "risk": "medium",
-                            "id": f"req-{len(requirements) + 1}"
-                        })
+            if findings_text is not None:
+                # Extract bullet points or numbered items; matches are walked lazily so
+                # items too short to be requirements are never copied out of the text
+                for match in _BULLET_RE.finditer(findings_text):
+                    # Filter out items that aren't likely to be requirements, checking
+                    # the raw length before allocating stripped or lowercased copies
+                    if match.end(1) - match.start(1) < 10:
+                        continue
+                    item = match.group(1)
+                    if len(item.strip()) < 10:
+                        continue
+                    item_lc = item.lower()
+                    if not _mentions_any(item_lc, _REQUIREMENT_TERMS):
+                        continue
+                        
+                    status = "not-met"
+                    if _mentions_any(item_lc, _STATUS_MET_HINTS) and _STATUS_MET_RE.search(item_lc):
+                        status = "met"
+                    elif _mentions_any(item_lc, _STATUS_PARTIAL_TERMS):
+                        status = "partial"
+                        
+                    descriptions.append(item)
+                    statuses.append(status)
+                categories.extend(["General"] * len(descriptions))
+                risks.extend(["medium"] * len(descriptions))
+        
+        if descriptions:
+            return [
+                {
+                    "title": description if len(description) <= 50 else f"{description[:50]}...",
+                    "description": description,
+                    "category": category,
+                    "status": status,
+                    "risk": risk,
+                    "id": f"req-{req_id}"
+                }
+                for req_id, (description, category, status, risk)
+                in enumerate(zip(descriptions, categories, statuses, risks), 1)
+            ]
+        
+        requirements = []
         
         # If still no requirements found, create generic ones based on compliance score
         if not requirements:
-            score = self.extract_compliance_score(content)
+            if score is None:
+                score = self.extract_compliance_score(content)
             
             # Create at least one requirement
             if score >= 80:
@@ -754,38 +2069,38 @@ Focus on providing deep insights specific to this company, not generic complianc
         
         return requirements
     
-    def extract_recommendations(self, content):
+    def extract_recommendations(self, content, sections=None):
         """
         Extract recommendations from the evaluation
         
         Args:
             content (str): Markdown content
+            sections (dict, optional): Pre-split sections from _split_sections
             
         Returns:
             list: Recommendations
         """
         recommendations = []
+        if sections is None:
+            sections = _split_sections(content)
         
         # Look for a recommendations section
-        rec_section_match = re.search(r'## (?:Recommendations?|Action Items?|Next Steps?|Suggested Actions?)\s*(.*?)(?=\n## |\n# |$)', 
-                                    content, re.DOTALL | re.IGNORECASE)
+        rec_text = _find_section(sections, _RECOMMENDATIONS_HEADINGS)
         
-        if rec_section_match:
-            rec_text = rec_section_match.group(1).strip()
+        if rec_text is not None:
             
             # Extract bullet points or numbered items
-            rec_items = re.findall(r'^(?:\d+\.|\*|\-)\s*(.*?)$', rec_text, re.MULTILINE)
+            rec_items = _find_bullets(rec_text)
             
             if rec_items:
                 for item in rec_items:
-                    priority = "medium"  # Default
-                    if re.search(r'immediately|urgent|critical|high priority', item, re.IGNORECASE):
-                        priority = "high"
-                    elif re.search(r'when possible|consider|may want to|low priority', item, re.IGNORECASE):
-                        priority = "low"
+                    item_lc = item.lower()
+                    priority = _priority(item_lc, _ITEM_PRIORITY_RE, _ITEM_PRIORITY_HINTS)
                         
-                    # Try to extract timeframe
-                    timeframe_match = re.search(r'within (\d+\s+(?:days?|weeks?|months?|years?))', item, re.IGNORECASE)
+                    # Try to extract timeframe. The prefilter leaves out the "wi": under
+                    # IGNORECASE the pattern's i also matches "İ" and "ı", which lower()
+                    # does not turn into "i"
+                    timeframe_match = _TIMEFRAME_RE.search(item) if "thin " in item_lc else None
                     timeframe = timeframe_match.group(0) if timeframe_match else "As soon as possible"
                     
                     recommendations.append({
@@ -803,15 +2118,10 @@ Focus on providing deep insights specific to this company, not generic complianc
         
         # If no specific recommendations section, look for recommendation mentions
         if not recommendations:
-            rec_mentions = re.findall(r'(?:recommend|should|must|need to|advised to)\s+(.*?)(?:\.|$)', 
-                                   content, re.IGNORECASE)
+            rec_mentions = _find_recommendation_mentions(content)
             
             for mention in rec_mentions:
-                priority = "medium"  # Default
-                if re.search(r'immediately|urgent|critical', mention, re.IGNORECASE):
-                    priority = "high"
-                elif re.search(r'when possible|consider|may want to', mention, re.IGNORECASE):
-                    priority = "low"
+                priority = _priority(mention.lower(), _MENTION_PRIORITY_RE, _MENTION_PRIORITY_HINTS)
                     
                 recommendations.append({
                     "description": mention.strip(),
@@ -821,55 +2131,58 @@ Focus on providing deep insights specific to this company, not generic complianc
         
         return recommendations
     
-    def extract_regulatory_references(self, content):
+    def extract_regulatory_references(self, content, sections=None):
         """
         Extract regulatory references from the evaluation
         
         Args:
             content (str): Markdown content
+            sections (dict, optional): Pre-split sections from _split_sections
             
         Returns:
             list: Regulatory references
         """
         references = []
+        if sections is None:
+            sections = _split_sections(content)
         
         # Look for references section
-        ref_section_match = re.search(r'## (?:References|Sources|Citations|Regulatory Sources)\s*(.*?)(?=\n## |\n# |$)', 
-                                    content, re.DOTALL | re.IGNORECASE)
+        ref_text = _find_section(sections, _REFERENCES_HEADINGS)
         
-        if ref_section_match:
-            ref_text = ref_section_match.group(1).strip()
+        if ref_text is not None:
             
             # Extract numbered references
-            ref_items = re.findall(r'^(?:\d+\.|\*|\-)\s*(.*?)$', ref_text, re.MULTILINE)
+            ref_items = _find_bullets(ref_text)
             
             if ref_items:
+                references = [None] * len(ref_items)
                 for i, item in enumerate(ref_items):
                     # Extract URL if present
-                    url_match = re.search(r'\[(.*?)\]\((https?://[^\)]+)\)', item)
+                    url_match = _REFERENCE_LINK_RE.search(item)
                     url = url_match.group(2) if url_match else ""
                     
                     # Clean up the text
                     text = url_match.group(1) if url_match else item
                     
-                    references.append({
+                    references[i] = {
                         "id": f"ref-{i+1}",
                         "title": text,
                         "url": url,
-                        "type": "government" if url and ('.gov' in url) else "other"
-                    })
+                        "type": "government" if _is_government_url(url) else "other"
+                    }
         
         # If no references found in dedicated section, extract from citations in text
         if not references:
-            citation_pattern = r'\[([^\]]+)\]\((https?://[^\)]+)\)'
-            citations = re.findall(citation_pattern, content)
-            
-            for i, (text, url) in enumerate(citations):
+            # Every citation becomes a reference, so build the list in one pass,
+            # reading matches lazily rather than collecting every (text, url) tuple first
+            references = []
+            for i, match in enumerate(_CITATION_RE.finditer(content), 1):
+                text, url = match.groups()
                 references.append({
-                    "id": f"ref-{i+1}",
+                    "id": f"ref-{i}",
                     "title": text,
                     "url": url,
-                    "type": "government" if '.gov' in url else "other"
+                    "type": "government" if _is_government_url(url) else "other"
                 })
         
         return references
@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for running the backend in production:
+
+    gunicorn -c gunicorn_conf.py app:app
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# Requests spend most of their time waiting on the Perplexity API, so a few
+# threaded workers per core overlap many in-flight requests cheaply
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Workers import the app after this file runs, so compliance_evaluator sees the
+# worker count and divides its OCR budget between them
+os.environ["WEB_CONCURRENCY"] = str(workers)
+worker_class = "gthread"
+threads = 16
+keepalive = 30
+
+# Multi-jurisdiction analyses can take well over the default 30 seconds
+timeout = 300
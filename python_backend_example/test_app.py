@@ -0,0 +1,37 @@
+import base64
+import itertools
+import os
+import unittest
+
+from app import encode_stream_base64
+
+
+class ShortReadStream:
+    """A stream whose read() returns fewer bytes than asked for, in varying amounts"""
+
+    def __init__(self, data, sizes=(1, 2, 7, 4096, 5, 100000)):
+        self.data = data
+        self.position = 0
+        self.sizes = itertools.cycle(sizes)
+
+    def read(self, size):
+        chunk = self.data[self.position:self.position + min(size, next(self.sizes))]
+        self.position += len(chunk)
+        return chunk
+
+
+class EncodeStreamBase64Test(unittest.TestCase):
+    def test_matches_b64encode_for_short_reads(self):
+        for length in (300000, 300001, 300002):
+            with self.subTest(length=length):
+                data = os.urandom(length)
+                encoded, size = encode_stream_base64(ShortReadStream(data))
+                self.assertEqual(encoded, base64.b64encode(data).decode("ascii"))
+                self.assertEqual(size, length)
+
+    def test_empty_stream(self):
+        self.assertEqual(encode_stream_base64(ShortReadStream(b"")), ("", 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
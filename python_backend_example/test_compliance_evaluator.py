@@ -0,0 +1,177 @@
+import json
+import unittest
+
+from compliance_evaluator import PerplexityComplianceEvaluator, _read_completion_stream, _split_sections
+
+
+# A report whose requirements and recommendations sit under H3 subsections
+H3_REPORT = """# Financial Compliance Evaluation for Acme in US
+
+**Date**: 2024-01-01
+
+## Executive Summary
+
+Acme is partially compliant.
+
+## Regulatory Analysis
+
+### Regulatory Requirements
+
+1. Register with FinCEN as a money services business - high risk
+2. Maintain an AML program with independent testing
+3. File suspicious activity reports within 30 days
+
+## Compliance Gaps
+
+### Recommendations
+
+- Immediately appoint a BSA officer within 30 days
+- Consider a third-party AML audit when possible
+
+## References
+
+1. [FinCEN](https://www.fincen.gov/msb)
+"""
+
+
+class SplitSectionsTest(unittest.TestCase):
+    def test_subsections_are_recorded(self):
+        sections = _split_sections(H3_REPORT)
+        self.assertIn("regulatory requirements", sections)
+        self.assertIn("recommendations", sections)
+        self.assertTrue(sections["regulatory requirements"].startswith("1. Register"))
+
+    def test_sections_end_at_next_h1_or_h2(self):
+        sections = _split_sections("## A\nx\n### B\ny\n### C\nz\n## D\nw\n# E\nv\n")
+        self.assertEqual(sections["a"], "x\n### B\ny\n### C\nz")
+        self.assertEqual(sections["b"], "y\n### C\nz")
+        self.assertEqual(sections["c"], "z")
+        self.assertEqual(sections["d"], "w")
+        self.assertNotIn("e", sections)
+
+    def test_empty_sections_are_skipped(self):
+        self.assertEqual(_split_sections("## Recommendations\n\n## References\n- a\n"),
+                         {"references": "- a"})
+
+
+class H3ReportExtractionTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = PerplexityComplianceEvaluator("test-key", use_cache=False)
+
+    def test_requirements_from_subsection(self):
+        requirements = self.evaluator.extract_requirements(H3_REPORT)
+        self.assertEqual(len(requirements), 3)
+        self.assertEqual(requirements[0]["risk"], "high")
+        self.assertTrue(requirements[2]["description"].startswith("File suspicious"))
+
+    def test_recommendations_from_subsection(self):
+        recommendations = self.evaluator.extract_recommendations(H3_REPORT)
+        self.assertEqual([rec["priority"] for rec in recommendations], ["high", "low"])
+        self.assertEqual(recommendations[0]["timeframe"], "within 30 days")
+
+
+class FakeResponse:
+    """Just enough of requests.Response for _read_completion_stream"""
+
+    def __init__(self, lines=(), content_type="text/event-stream", body=None):
+        self.headers = {"Content-Type": content_type}
+        self.lines = lines
+        self.body = body
+
+    def iter_lines(self):
+        return iter(self.lines)
+
+    def json(self):
+        return self.body
+
+
+def _event(**fields):
+    return b"data: " + json.dumps(fields).encode()
+
+
+class ReadCompletionStreamTest(unittest.TestCase):
+    def test_joins_delta_content_across_events(self):
+        response = FakeResponse([
+            _event(id="a", choices=[{"delta": {"role": "assistant", "content": "Hello"}}]),
+            b"",
+            b": keep-alive",
+            _event(id="a", choices=[{"delta": {"content": ", "}}]),
+            b"",
+            _event(id="a", choices=[{"delta": {"content": "world"}, "finish_reason": "stop"}],
+                   citations=["https://www.sec.gov"]),
+            b"",
+            b"data: [DONE]",
+            _event(id="after-done", choices=[{"delta": {"content": "ignored"}}]),
+        ])
+        result = _read_completion_stream(response)
+        self.assertEqual(result["choices"][0]["message"]["content"], "Hello, world")
+        self.assertEqual(result["choices"][0]["finish_reason"], "stop")
+        self.assertEqual(result["citations"], ["https://www.sec.gov"])
+        self.assertEqual(result["id"], "a")
+
+    def test_top_level_fields_come_from_last_event(self):
+        response = FakeResponse([
+            _event(citations=["https://old.gov"], choices=[{"delta": {"content": "a"}}]),
+            _event(citations=["https://new.gov"], usage={"total_tokens": 3},
+                   choices=[{"delta": {}, "finish_reason": "length"}]),
+        ])
+        result = _read_completion_stream(response)
+        self.assertEqual(result["citations"], ["https://new.gov"])
+        self.assertEqual(result["usage"], {"total_tokens": 3})
+        self.assertEqual(result["choices"][0]["finish_reason"], "length")
+
+    def test_non_streaming_json_fallback(self):
+        body = {"choices": [{"message": {"content": "whole"}}], "citations": []}
+        response = FakeResponse(content_type="application/json; charset=utf-8", body=body)
+        self.assertIs(_read_completion_stream(response), body)
+
+
+def _report(score):
+    return f"# Report\n\n## Compliance Score\n\n{score}/100\n"
+
+
+def _completion(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+class EvaluateComplianceBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.evaluator = PerplexityComplianceEvaluator("test-key", use_cache=False)
+        self.companies = [
+            {"company_data": {"companyName": "Acme"}, "jurisdiction": "us"},
+            {"company_data": {"companyName": "Globex"}, "jurisdiction": "uk"},
+        ]
+        self.queries = []
+
+    def stub_perplexity(self, batch_content):
+        def query_perplexity_api(query, max_tokens=4000, use_cache=True):
+            self.queries.append(query)
+            if "JSON array" in query:
+                return _completion(batch_content)
+            return _completion(_report(20))
+        self.evaluator.query_perplexity_api = query_perplexity_api
+
+    def test_valid_array(self):
+        self.stub_perplexity("```json\n" + json.dumps([_report(90), _report(50)]) + "\n```")
+        results = self.evaluator.evaluate_compliance_batch(self.companies)
+        self.assertEqual(len(self.queries), 1)
+        self.assertEqual([result["companyName"] for result in results], ["Acme", "Globex"])
+        self.assertEqual([result["complianceScore"] for result in results], [90, 50])
+
+    def test_malformed_array_falls_back_per_company(self):
+        self.stub_perplexity('["Acme report", not json]')
+        results = self.evaluator.evaluate_compliance_batch(self.companies)
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual([result["companyName"] for result in results], ["Acme", "Globex"])
+        self.assertEqual([result["complianceScore"] for result in results], [20, 20])
+
+    def test_wrong_length_array_falls_back_per_company(self):
+        self.stub_perplexity(json.dumps([_report(90)]))
+        results = self.evaluator.evaluate_compliance_batch(self.companies)
+        self.assertEqual(len(self.queries), 3)
+        self.assertEqual([result["jurisdictionId"] for result in results], ["us", "uk"])
+        self.assertEqual([result["complianceScore"] for result in results], [20, 20])
+
+
+if __name__ == "__main__":
+    unittest.main()